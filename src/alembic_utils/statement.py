@@ -1,49 +1,69 @@
+import re
+from functools import lru_cache
 from typing import TypeAlias, Union
-from uuid import uuid4
 
 StorageParameter: TypeAlias = Union[str, tuple[str, Union[str, int, float]]]
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_ASCII_WHITESPACE_RE = re.compile(r"[ \t\n\r\v\f]+")
+_INT_RE = re.compile(r"-?\d+")
+_FLOAT_RE = re.compile(r"-?\d*\.\d+")
+_QUOTED_RE = re.compile(r'^"[^"]+"(?:\."[^"]+")?$')
+_PARAM_RE = re.compile(r"(?:^|,)([^,=]*)(?:=([^,]*))?")
+_DROP_QUOTES = str.maketrans("", "", '"')
+
 
 def normalize_whitespace(text, base_whitespace: str = " ") -> str:
     """Convert all whitespace to *base_whitespace*"""
+    if base_whitespace == " ":
+        ws_re = _ASCII_WHITESPACE_RE if text.isascii() else _WHITESPACE_RE
+        return ws_re.sub(" ", text).strip()
     return base_whitespace.join(text.split()).strip()
 
 
 def strip_terminating_semicolon(sql: str) -> str:
     """Removes terminating semicolon on a SQL statement if it exists"""
-    return sql.strip().rstrip(";").strip()
+    return sql.strip().rstrip(";").rstrip()
 
 
 def strip_double_quotes(sql: str) -> str:
     """Removes starting and ending double quotes"""
-    sql = sql.strip().rstrip('"')
-    return sql.strip().lstrip('"').strip()
+    return sql.strip(' \t\n\r\v\f"')
+
+
+_COLON_RE = re.compile(r"::|:")
+_COLON_MAP = {"::": "::", ":": r"\:"}
 
 
+@lru_cache(maxsize=256)
 def escape_colon_for_sql(sql: str) -> str:
     """Escapes colons for use in sqlalchemy.text"""
-    holder = str(uuid4())
-    sql = sql.replace("::", holder)
-    sql = sql.replace(":", r"\:")
-    sql = sql.replace(holder, "::")
-    return sql
+    return _COLON_RE.sub(lambda match: _COLON_MAP[match.group()], sql)
 
 
+_PLPGSQL_COLON_RE = re.compile(r"::|:=|\\:|:")
+_PLPGSQL_COLON_MAP = {"::": "::", ":=": ":=", r"\:": r"\:", ":": r"\:"}
+
+
+@lru_cache(maxsize=256)
 def escape_colon_for_plpgsql(sql: str) -> str:
     """Escapes colons for plpgsql for use in sqlalchemy.text"""
-    holder1 = str(uuid4())
-    holder2 = str(uuid4())
-    holder3 = str(uuid4())
-    sql = sql.replace("::", holder1)
-    sql = sql.replace(":=", holder2)
-    sql = sql.replace(r"\:", holder3)
+    return _PLPGSQL_COLON_RE.sub(lambda match: _PLPGSQL_COLON_MAP[match.group()], sql)
 
-    sql = sql.replace(":", r"\:")
 
-    sql = sql.replace(holder3, r"\:")
-    sql = sql.replace(holder2, ":=")
-    sql = sql.replace(holder1, "::")
-    return sql
+@lru_cache(maxsize=32)
+def _storage_parameters_template(shape: tuple[bool, ...]) -> str:
+    """Builds a WITH clause format template where *shape* flags key=value pairs"""
+    slots = []
+    index = 0
+    for is_pair in shape:
+        if is_pair:
+            slots.append("{%d}={%d}" % (index, index + 1))
+            index += 2
+        else:
+            slots.append("{%d}" % index)
+            index += 1
+    return " WITH (" + ", ".join(slots) + ")"
 
 
 def format_storage_parameters_clause(
@@ -56,13 +76,19 @@ def format_storage_parameters_clause(
         format_storage_parameters_clause([]) => ""
         format_storage_parameters_clause(None) => ""
     """
-    if storage_parameters is None or len(storage_parameters) == 0:
+    if not storage_parameters:
         return ""
-    params = [
-        param if isinstance(param, str) else f"{param[0]}={param[1]}"
-        for param in storage_parameters
-    ]
-    return f" WITH ({', '.join(params)})"
+    shape = []
+    values: list[Union[str, int, float]] = []
+    for param in storage_parameters:
+        if type(param) is str:
+            shape.append(False)
+            values.append(param)
+        else:
+            shape.append(True)
+            values.append(param[0])
+            values.append(param[1])
+    return _storage_parameters_template(tuple(shape)).format(*values)
 
 
 def parse_storage_parameters(storage_parameters: str) -> list[StorageParameter]:
@@ -72,23 +98,31 @@ def parse_storage_parameters(storage_parameters: str) -> list[StorageParameter]:
         parse_storage_parameters("param1,param2=80, param3='test'") => ["param1",("param2",80),("param3","'test'")]
     """
     params: list[StorageParameter] = []
-    for part in storage_parameters.split(","):
-        new_part: StorageParameter = part.strip()
-        if "=" in part:
-            split_part = part.split("=", 1)
-            # doing it this way so mypy doesn't complain
-            new_part = (split_part[0].strip(), split_part[1].strip())
+    for match in _PARAM_RE.finditer(storage_parameters):
+        key, value = match.groups()
+        key = key.strip()
+        if value is None:
+            params.append(key)
+            continue
+        value = value.strip()
+        converted: Union[str, int, float]
+        if _INT_RE.fullmatch(value):
+            converted = int(value)
+        elif _FLOAT_RE.fullmatch(value):
+            converted = float(value)
+        else:
             try:
-                new_part = (part[0], int(part[1]))
+                converted = int(value)
             except ValueError:
                 try:
-                    new_part = (part[0], float(part[1]))
+                    converted = float(value)
                 except ValueError:
-                    pass
-        params.append(new_part)
+                    converted = value
+        params.append((key, converted))
     return params
 
 
+@lru_cache(maxsize=1024)
 def coerce_to_quoted(text: str) -> str:
     """Coerces schema and entity names to double quoted one
 
@@ -99,16 +133,17 @@ def coerce_to_quoted(text: str) -> str:
         coerce_to_quoted('"public".table') => '"public"."table"'
         coerce_to_quoted('public."table"') => '"public"."table"'
     """
+    if _QUOTED_RE.match(text):
+        return text
+
     if "." in text:
         schema, _, name = text.partition(".")
-        schema = f'"{strip_double_quotes(schema)}"'
-        name = f'"{strip_double_quotes(name)}"'
-        return f"{schema}.{name}"
+        return '"' + strip_double_quotes(schema) + '"."' + strip_double_quotes(name) + '"'
 
-    text = strip_double_quotes(text)
-    return f'"{text}"'
+    return '"' + strip_double_quotes(text) + '"'
 
 
+@lru_cache(maxsize=1024)
 def coerce_to_unquoted(text: str) -> str:
     """Coerces schema and entity names to unquoted
 
@@ -118,4 +153,4 @@ def coerce_to_unquoted(text: str) -> str:
         coerce_to_unquoted('public.table') => 'public.table'
         coerce_to_unquoted('"public".table') => 'public.table'
     """
-    return "".join(text.split('"'))
+    return text.translate(_DROP_QUOTES)